@@ -1,121 +1,512 @@
 import logging
 import os
 import re
-import json
+import orjson
+import atexit
+import copy
+import hashlib
+import random
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
 from dotenv import load_dotenv
-import google.generativeai as genai
-from typing import Dict, List
+from google.api_core.exceptions import DeadlineExceeded, ResourceExhausted
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
-# Setup logging
-logging.basicConfig(level=logging.DEBUG, filename='logs.txt', format='%(asctime)s - %(levelname)s - %(message)s')
+# Logging is configured by the application entry point (app.py)
 logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
 
-# Configure Gemini API
-try:
-    genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-    llm = genai.GenerativeModel("gemini-1.5-flash")
-except Exception as e:
-    logger.error(f"Failed to configure Gemini API: {e}")
-    raise
+# Static screening rules, sent once as the model's system instruction so each
+# request only carries the resume, job description and projects
+_SYSTEM_INSTRUCTION = """You are a technical screener for candidates who have passed initial HR screening. Score the candidate against the job's technical requirements and return ONLY valid JSON.
+
+SKILLS FROM THE JOB DESCRIPTION:
+- Mandatory: skills under "required", "must have", "essential" or "mandatory". Tools in parentheses count as separate skills ("Generative AI frameworks (like GPT, BERT)" -> "GPT", "BERT"). Drop prefixes such as "Proficiency in", "Strong", "Experience with". Split on "and" and commas ("Python and R" -> "Python", "R").
+- Good-to-have: skills under "preferred", "nice to have" or "good to have".
+
+SCORING (0-100, capped at 100; exact, case-insensitive skill matching):
+- Projects, 70 points: matched project skills / total mandatory skills x 70.
+- Technical skills, 10 points: non-project skills (e.g. the Skills section) matching mandatory skills / total mandatory skills x 10.
+- Good-to-have skills, 10 points: skills from anywhere matching good-to-have skills / total good-to-have skills x 10.
+- Experience, 10 points: 10 if the required years is 0, otherwise min(10, candidate years / required years x 10), minus 2 points per year below the requirement (minimum 0).
+
+PAIN POINTS:
+- critical: mandatory skills not covered by any project; no project experience relevant to the job.
+- major: insufficient years of experience; limited project experience in required technologies.
+- minor: missing good-to-have skills; could benefit from more project exposure.
+
+SUMMARY: 130-160 words covering project alignment with mandatory skills, non-project and good-to-have skills, experience fit and gaps, and focus areas for the technical interview. For scores of 70+ emphasize project strengths, for 50-69 highlight gaps and upskilling needs, below 50 note significant deficiencies.
+
+PROJECTS: for each project give its name, description, extracted skills and relevance to the mandatory skills (e.g. "Matches Python and AWS requirements"). If there are no projects, say so and assess the other sections.
+
+STATUS: "Shortlisted" if score >= 70, "Under Consideration" if 50-69, "Rejected" if below 50.
+
+Prioritize hands-on project evidence, base the assessment strictly on the resume, and do not infer unlisted skills."""
+
+GEMINI_MODEL_NAME = "gemini-1.5-flash"
+
+# Structured-output schema for the technical analysis; Gemini constrains decoding
+# to it, so responses always parse and carry every key with the right type
+_STRING_LIST_SCHEMA = {"type": "ARRAY", "items": {"type": "STRING"}}
+_ANALYSIS_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "score": {"type": "INTEGER"},
+        "pain_points": {
+            "type": "OBJECT",
+            "properties": {"critical": _STRING_LIST_SCHEMA, "major": _STRING_LIST_SCHEMA, "minor": _STRING_LIST_SCHEMA},
+            "required": ["critical", "major", "minor"]
+        },
+        "summary": {"type": "STRING"},
+        "status": {"type": "STRING", "format": "enum", "enum": ["Shortlisted", "Under Consideration", "Rejected"]},
+        "projects": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "name": {"type": "STRING"},
+                    "description": {"type": "STRING"},
+                    "skills": _STRING_LIST_SCHEMA,
+                    "relevance": {"type": "STRING"}
+                },
+                "required": ["name", "description", "skills", "relevance"]
+            }
+        }
+    },
+    "required": ["score", "pain_points", "summary", "status", "projects"]
+}
+
+# Heuristic scores outside this band are treated as decisive and skip the LLM call
+_LLM_SKIP_BELOW = 30
+_LLM_SKIP_ABOVE = 95
+
+# Process-wide worker pool for concurrent Gemini calls; reusing it avoids per-call
+# thread setup and caps in-flight requests at ATS_WORKERS across all callers
+_EXECUTOR = ThreadPoolExecutor(max_workers=int(os.getenv("ATS_WORKERS", "8")), thread_name_prefix="ats")
+atexit.register(_EXECUTOR.shutdown)
+
+# Gemini is configured and the analysis model built on first use, so importing
+# this module (e.g. for fallback_ats_score alone) does not touch the API stack.
+_gemini_configured = False
+_llm = None
+_llm_lock = threading.Lock()
+
+def configure_gemini() -> None:
+    """
+    Configure the Gemini API once per process. This is the only genai.configure
+    call in the app: every GenerativeModel built afterwards shares the same client.
+    """
+    global _gemini_configured
+    with _llm_lock:
+        if _gemini_configured:
+            return
+        import google.generativeai as genai
+        try:
+            genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+        except Exception as e:
+            logger.error("Failed to configure Gemini API: %s", e)
+            raise
+        _gemini_configured = True
 
-def fallback_ats_score(resume_text: str, job_description: str, required_experience: int, projects: List[Dict]) -> Dict:
+def get_llm():
     """
-    Fallback scoring logic if LLM fails - adjusted for new scoring weights.
-    Scoring: 70% projects, 10% technical skills, 10% good-to-have skills, 10% experience.
+    Return the shared technical-analysis model, creating it on first use.
     """
-    score = 0
-    pain_points_list = []
+    global _llm
+    if _llm is None:
+        configure_gemini()
+        with _llm_lock:
+            if _llm is None:
+                import google.generativeai as genai
+                _llm = genai.GenerativeModel(
+                    GEMINI_MODEL_NAME,
+                    system_instruction=_SYSTEM_INSTRUCTION,
+                    generation_config={"response_mime_type": "application/json", "response_schema": _ANALYSIS_SCHEMA}
+                )
+    return _llm
+
+# Years-of-experience mentions in a resume ("4 years of experience", "5+ yrs", "over 5 years",
+# "3 to 5 years"). Each pattern counts only its first match, so stray numbers later in the
+# resume (graduation years, version numbers) are not read as experience.
+_EXPERIENCE_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in [
+    r'(\d+\.?\d*)\s*(?:year|yr|yrs|years)?\s*(?:of\s*)?(?:experience|exp)',
+    r'(\d+\.?\d*)\+?\s*(?:year|yr|yrs|years)',
+    r'over\s*(\d+\.?\d*)\s*(?:year|yr|yrs|years)',
+    r'(\d+\.?\d*)\s*to\s*\d+\.?\d*\s*(?:year|yr|yrs|years)'
+])
+
+# Job description and resume parsing patterns used by fallback_ats_score, compiled once at import
+_MANDATORY_BLOCK_PATTERN = re.compile(r'(?:required|must have|essential|mandatory)\s*[:\s]*(.*?)(?=\n[A-Z][a-zA-Z\s]+:|\Z)', re.IGNORECASE | re.DOTALL)
+_GOOD_TO_HAVE_BLOCK_PATTERN = re.compile(r'(?:preferred|nice to have|good to have)\s*[:\s]*(.*?)(?=\n[A-Z][a-zA-Z\s]+:|\Z)', re.IGNORECASE | re.DOTALL)
+# JD skill lines carry bullets, "Label:" prefixes and lead-in phrases that are not skills
+_JD_BULLET_PATTERN = re.compile(r'^[-•*▪◦·]+\s*')
+_JD_LABEL_PATTERN = re.compile(r'^[A-Za-z][A-Za-z /&-]*:\s*')
+_JD_LEAD_IN_PATTERN = re.compile(r'^(?:Proficiency in|Strong|Experience with|Understanding of|Familiarity with|Knowledge of)\s+', re.IGNORECASE)
+_JD_YEARS_PATTERN = re.compile(r'\d+\s*\+?\s*(?:years?|yrs?)\b', re.IGNORECASE)
+_PAREN_CONTENT_PATTERN = re.compile(r'\((.*?)\)')
+_PAREN_STRIP_PATTERN = re.compile(r'\s*\([^()]*\)')
+_SKILL_SPLIT_PATTERN = re.compile(r',\s*|\s+and\s+', re.IGNORECASE)
+_SKILLS_SECTION_MARKER = "[SECTION: Skills]"
+_SECTION_MARKER_PREFIX = "[SECTION:"
+
+class LRUCache:
+    """
+    Small thread-safe least-recently-used cache with optional per-entry expiry.
+    """
+    def __init__(self, maxsize: int, ttl_seconds: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str):
+        with self.lock:
+            if key not in self.entries:
+                return None
+            expires_at, value = self.entries[key]
+            if expires_at is not None and expires_at < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value) -> None:
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self.lock:
+            self.entries[key] = (expires_at, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+# Retry policy for Gemini rate-limit (429 / ResourceExhausted) errors
+_MAX_LLM_ATTEMPTS = 4
+_BACKOFF_BASE_SECONDS = 2
+_MAX_BACKOFF_SECONDS = 60
+_BACKOFF_JITTER = 0.3
+
+# Per-attempt Gemini deadlines: a slow call is cut off and retried once with a
+# longer deadline instead of holding up the whole batch
+_LLM_TIMEOUTS_SECONDS = (30.0, 60.0)
+
+def _backoff_delay(error: ResourceExhausted, attempt: int) -> float:
+    """
+    Seconds to wait before retrying after a rate-limit error.
+    Honors a Retry-After header when the API sends one, otherwise uses
+    exponential backoff with jitter.
+    """
+    # The gRPC transport attaches a grpc Call as the response, which has no headers
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        retry_after = headers.get("Retry-After")
+        if retry_after:
+            return max(0.0, min(float(retry_after), _MAX_BACKOFF_SECONDS))
+    except (AttributeError, TypeError, ValueError):
+        pass
+    delay = min(_MAX_BACKOFF_SECONDS, _BACKOFF_BASE_SECONDS * 2 ** (attempt - 1))
+    return random.uniform(delay * (1 - _BACKOFF_JITTER), delay * (1 + _BACKOFF_JITTER))
+
+class _RateLimiter:
+    """
+    Spaces out request starts so concurrent callers stay under a requests-per-minute quota.
+    """
+    def __init__(self, requests_per_minute: int):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Claim the next request slot and return how many seconds to wait for it.
+        """
+        if not self.interval:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        return slot - now
+
+    def wait(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+# Shared across threads so batch scoring respects the Gemini quota as a whole
+_gemini_rate_limiter = _RateLimiter(int(os.getenv("GEMINI_RPM", "1000")))
+
+class _JsonStreamCollector:
+    """
+    Accumulates streamed response chunks and fails fast as soon as the output
+    clearly is not a JSON object, instead of waiting for the remaining tokens.
+    """
+    def __init__(self):
+        self.chunks = []
+        self.checked_start = False
+
+    def add(self, text: str) -> None:
+        self.chunks.append(text)
+        if not self.checked_start:
+            head = "".join(self.chunks).lstrip()
+            if head:
+                self.checked_start = True
+                if not head.startswith("{"):
+                    raise ValueError(f"LLM output is not JSON: {head[:50]!r}")
+
+    def text(self) -> str:
+        return "".join(self.chunks).strip()
+
+def _stream_text(prompt: str, timeout: float) -> str:
+    """
+    Stream a Gemini response and return its text.
+    """
+    _gemini_rate_limiter.wait()
+    collector = _JsonStreamCollector()
+    for chunk in get_llm().generate_content(prompt, stream=True, request_options={"timeout": timeout}):
+        collector.add(chunk.text)
+    return collector.text()
+
+def _generate_text(prompt: str) -> str:
+    """
+    Call Gemini, retrying rate-limit errors with exponential backoff and
+    retrying a timed-out call once with a longer deadline.
+    """
+    timeout_index = 0
+    for attempt in range(1, _MAX_LLM_ATTEMPTS + 1):
+        try:
+            return _stream_text(prompt, _LLM_TIMEOUTS_SECONDS[timeout_index])
+        except DeadlineExceeded:
+            if attempt == _MAX_LLM_ATTEMPTS or timeout_index + 1 == len(_LLM_TIMEOUTS_SECONDS):
+                raise
+            timeout_index += 1
+            logger.warning("Gemini call timed out (attempt %s/%s), retrying with a %.0fs deadline", attempt, _MAX_LLM_ATTEMPTS, _LLM_TIMEOUTS_SECONDS[timeout_index])
+        except ResourceExhausted as e:
+            if attempt == _MAX_LLM_ATTEMPTS:
+                raise
+            delay = _backoff_delay(e, attempt)
+            logger.warning("Gemini rate limit hit (attempt %s/%s), retrying in %.1fs", attempt, _MAX_LLM_ATTEMPTS, delay)
+            time.sleep(delay)
+
+# Validated LLM analyses keyed by the analysis inputs, so re-scoring the same resume
+# against the same job (re-runs, duplicate uploads) skips prompt building and the API
+_analysis_cache = LRUCache(maxsize=1024, ttl_seconds=7 * 24 * 3600)
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def _analysis_cache_key(resume_text: str, job_description: str, required_experience: int, projects: List[Dict]) -> str:
+    """
+    Cache key from (resume hash, JD hash, required experience, projects), plus the
+    model and instructions so a prompt or model change never serves stale results.
+    """
+    return "|".join([
+        _sha256(resume_text),
+        _sha256(job_description),
+        str(required_experience),
+        hashlib.sha256(orjson.dumps(projects, option=orjson.OPT_SORT_KEYS)).hexdigest(),
+        GEMINI_MODEL_NAME,
+        _sha256(_SYSTEM_INSTRUCTION)
+    ])
+
+# Generic JD phrases that are categories rather than concrete skills
+_NON_SPECIFIC_SKILLS = frozenset({'programming skills', 'Generative AI frameworks', 'ML libraries', 'data analysis', 'visualization tools', 'cloud platforms'})
+
+_WORD_CHAR_PATTERN = re.compile(r'\w')
+
+def _is_word_char(char: str) -> bool:
+    """
+    Check whether a character is a regex word character (\\w).
+    """
+    return _WORD_CHAR_PATTERN.match(char) is not None
+
+def _trie_regex(keys: List[str]) -> str:
+    """
+    Build a regex alternation for the given keys factored as a character trie,
+    e.g. ["java", "javascript", "jax"] -> "ja(?:va(?:script)?|x)".
+    Shared prefixes are matched once, and optional tails are greedy so the
+    longest key wins at any position, as with a longest-first alternation.
+    """
+    trie = {}
+    for key in keys:
+        node = trie
+        for char in key:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return "(?:" + body + ")?" if "" in node else body
+
+    return build(trie)
+
+class _SkillMatcher:
+    """
+    Whole-word, case-insensitive matcher for a list of skills.
+    All skills are compiled into one trie-factored regex so each text is scanned
+    once, instead of running one regex per (skill, text) pair.
+    """
+    def __init__(self, skills: List[str]):
+        self.skills_by_key = {}
+        for skill in skills:
+            self.skills_by_key.setdefault(skill.lower(), []).append(skill)
+        keys = sorted(self.skills_by_key, key=len, reverse=True)
+
+        # Zero-width lookahead so overlapping skills (e.g. "Learning" inside "Machine Learning") are all seen.
+        # Skills are delimited by "no word character on either side" rather than \b, which needs a
+        # word character next to the skill's edge and so never matches "C++", ".NET" or "C#".
+        self.pattern = re.compile(r'(?=(?<!\w)(' + _trie_regex(keys) + r')(?!\w))', re.IGNORECASE) if keys else None
+
+        # A skill that is a whole-word prefix of a longer one starts at the same position,
+        # so the alternation only reports the longer one; credit the shorter skill as well
+        self.prefix_keys = {
+            key: [other for other in keys if len(other) < len(key) and key.startswith(other) and not _is_word_char(key[len(other)])]
+            for key in keys
+        }
+
+    def find(self, texts: List[str]) -> set:
+        """
+        Return the skills that occur as whole words in any of the given texts.
+        """
+        found = set()
+        if self.pattern is None or not texts:
+            return found
+        for match in self.pattern.finditer("\n".join(texts)):
+            key = match.group(1).lower()
+            for matched_key in [key] + self.prefix_keys.get(key, []):
+                found.update(self.skills_by_key.get(matched_key, []))
+        return found
+
+def _clean_jd_skill(text: str) -> str:
+    """
+    Strip a bullet, a "Label:" prefix and a lead-in phrase ("Proficiency in", ...) from a
+    JD skill line or item. Experience requirements ("3+ years of ...") are not skills
+    and come back empty.
+    """
+    text = _JD_BULLET_PATTERN.sub('', text.strip())
+    text = _JD_LABEL_PATTERN.sub('', text)
+    text = _JD_LEAD_IN_PATTERN.sub('', text)
+    return '' if _JD_YEARS_PATTERN.search(text) else text.strip()
 
-    # Extract skills from job description
+@lru_cache(maxsize=256)
+def _extract_jd_skills(job_description: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """
+    Extract (mandatory, good-to-have) skills from a job description.
+    Cached because one job description is scored against every resume in a batch.
+    """
     # Mandatory skills
-    mandatory_skills_raw = re.findall(r'(?:required|must have|essential|mandatory)\s*[:\s]*(.*?)(?=\n[A-Z][a-zA-Z\s]+:|\Z)', job_description, re.IGNORECASE | re.DOTALL)
+    mandatory_skills_raw = _MANDATORY_BLOCK_PATTERN.findall(job_description)
     mandatory_skills = []
     for skill_block in mandatory_skills_raw:
         lines = [line.strip() for line in skill_block.split('\n') if line.strip()]
         for line in lines:
-            # Remove verbose prefixes
-            line = re.sub(r'^(Proficiency in|Strong|Experience with|Understanding of)\s+', '', line, flags=re.IGNORECASE)
+            # Remove bullets, labels and verbose prefixes
+            line = _clean_jd_skill(line)
             # Extract skills in parentheses
-            paren_skills = re.findall(r'\((.*?)\)', line)
+            paren_skills = _PAREN_CONTENT_PATTERN.findall(line)
             if paren_skills:
                 for skill_group in paren_skills:
-                    skills = [s.strip() for s in skill_group.split(',') if s.strip()]
+                    skills = [_clean_jd_skill(s) for s in skill_group.split(',')]
+                    skills = [s for s in skills if s]
                     mandatory_skills.extend(skills)
             # Remove parentheses and their content for the remaining text
-            line = re.sub(r'\s*\([^()]*\)', '', line)
+            line = _PAREN_STRIP_PATTERN.sub('', line)
             # Split by 'and' or commas
-            skills = re.split(r',\s*|\s+and\s+', line, flags=re.IGNORECASE)
-            skills = [skill.strip() for skill in skills if skill.strip()]
+            skills = _SKILL_SPLIT_PATTERN.split(line)
+            skills = [skill for skill in map(_clean_jd_skill, skills) if skill]
             mandatory_skills.extend(skills)
     # Remove duplicates and non-specific terms
-    non_specific_terms = {'programming skills', 'Generative AI frameworks', 'ML libraries', 'data analysis', 'visualization tools', 'cloud platforms'}
-    mandatory_skills = list(set(skill for skill in mandatory_skills if skill and skill not in non_specific_terms))
-    logger.debug(f"Extracted mandatory skills: {mandatory_skills}")
+    mandatory_skills = tuple(set(skill for skill in mandatory_skills if skill and skill not in _NON_SPECIFIC_SKILLS))
+    logger.debug("Extracted mandatory skills: %s", mandatory_skills)
 
     # Good-to-have skills
-    good_to_have_skills = re.findall(r'(?:preferred|nice to have|good to have)\s*[:\s]*(.*?)(?=\n[A-Z][a-zA-Z\s]+:|\Z)', job_description, re.IGNORECASE | re.DOTALL)
+    good_to_have_skills = _GOOD_TO_HAVE_BLOCK_PATTERN.findall(job_description)
     good_to_have_skills_list = []
     for skill_block in good_to_have_skills:
         lines = [line.strip() for line in skill_block.split('\n') if line.strip()]
         for line in lines:
-            line = re.sub(r'^(Experience with|Familiarity with|Knowledge of)\s+', '', line, flags=re.IGNORECASE)
-            skills = re.split(r',\s*|\s+and\s+', line, flags=re.IGNORECASE)
-            skills = [skill.strip() for skill in skills if skill.strip()]
+            line = _clean_jd_skill(line)
+            skills = _SKILL_SPLIT_PATTERN.split(line)
+            skills = [skill for skill in map(_clean_jd_skill, skills) if skill]
             good_to_have_skills_list.extend(skills)
-    good_to_have_skills = list(set(skill for skill in good_to_have_skills_list if skill))
-    logger.debug(f"Extracted good-to-have skills: {good_to_have_skills}")
+    good_to_have_skills = tuple(set(skill for skill in good_to_have_skills_list if skill))
+    logger.debug("Extracted good-to-have skills: %s", good_to_have_skills)
+
+    return mandatory_skills, good_to_have_skills
+
+@lru_cache(maxsize=256)
+def _get_skill_matcher(skills: Tuple[str, ...]) -> _SkillMatcher:
+    """
+    Return a shared matcher for a skill list, so it is compiled once per job description.
+    """
+    return _SkillMatcher(list(skills))
+
+def fallback_ats_score(resume_text: str, job_description: str, required_experience: int, projects: List[Dict]) -> Dict:
+    """
+    Fallback scoring logic if LLM fails - adjusted for new scoring weights.
+    Scoring: 70% projects, 10% technical skills, 10% good-to-have skills, 10% experience.
+    """
+    score = 0
+    pain_points_list = []
+
+    # Extract skills from job description (cached per job description)
+    mandatory_skills, good_to_have_skills = _extract_jd_skills(job_description)
 
     # 70% Project Skills
-    project_skills = []
-    for project in projects:
-        project_skills.extend(project.get("skills", []))
-    project_skills = list(set(project_skills))  # Remove duplicates
-    logger.debug(f"Project skills: {project_skills}")
-
-    matched_project_skills = sum(1 for skill in mandatory_skills if any(re.search(rf'\b{skill}\b', ps, re.IGNORECASE) for ps in project_skills))
-    matched_skills = [skill for skill in mandatory_skills if any(re.search(rf'\b{skill}\b', ps, re.IGNORECASE) for ps in project_skills)]
-    logger.debug(f"Matched mandatory skills in projects: {matched_skills}")
+    project_skill_set = {skill for project in projects for skill in project.get("skills", [])}
+    project_skills = list(project_skill_set)  # Remove duplicates
+    logger.debug("Project skills: %s", project_skills)
+
+    # Match each project once; the union scores the projects and the per-project
+    # sets are reused for the relevance notes below
+    mandatory_matcher = _get_skill_matcher(mandatory_skills)
+    found_per_project = [mandatory_matcher.find(project.get("skills", [])) for project in projects]
+    found_in_projects = set().union(*found_per_project)
+    matched_project_skills = sum(1 for skill in mandatory_skills if skill in found_in_projects)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Matched mandatory skills in projects: %s", [skill for skill in mandatory_skills if skill in found_in_projects])
     project_score = (matched_project_skills / max(len(mandatory_skills), 1)) * 70 if mandatory_skills else 0
     score += project_score
     if matched_project_skills < len(mandatory_skills):
-        missing_skills = [skill for skill in mandatory_skills if not any(re.search(rf'\b{skill}\b', ps, re.IGNORECASE) for ps in project_skills)]
+        missing_skills = [skill for skill in mandatory_skills if skill not in found_in_projects]
         pain_points_list.append(f"Missing mandatory project skills: {', '.join(missing_skills)}")
 
     # 10% Technical Skills (non-project)
-    skills_section = re.search(r'\[SECTION: Skills\](.*?)(?=\[SECTION:|\Z)', resume_text, re.DOTALL)
+    # The Skills section runs from its marker to the next section marker (or the end)
     technical_skills = []
-    if skills_section:
-        skills_text = skills_section.group(1).strip()
+    section_start = resume_text.find(_SKILLS_SECTION_MARKER)
+    if section_start != -1:
+        section_start += len(_SKILLS_SECTION_MARKER)
+        section_end = resume_text.find(_SECTION_MARKER_PREFIX, section_start)
+        skills_text = resume_text[section_start:section_end if section_end != -1 else len(resume_text)].strip()
         for skill in skills_text.split('\n'):
             skill = skill.strip()
-            if skill and skill not in project_skills:  # Exclude project skills
+            if skill and skill not in project_skill_set:  # Exclude project skills
                 technical_skills.append(skill)
-    matched_tech_skills = sum(1 for skill in mandatory_skills if any(re.search(rf'\b{skill}\b', ts, re.IGNORECASE) for ts in technical_skills))
+    matched_tech_skills = len(mandatory_matcher.find(technical_skills))
     tech_score = (matched_tech_skills / max(len(mandatory_skills), 1)) * 10 if mandatory_skills else 0
     score += tech_score
 
     # 10% Good-to-Have Skills
     all_skills = project_skills + technical_skills
-    matched_good_to_have = sum(1 for skill in good_to_have_skills if any(re.search(rf'\b{skill}\b', s, re.IGNORECASE) for s in all_skills))
+    found_good_to_have = _get_skill_matcher(good_to_have_skills).find(all_skills)
+    matched_good_to_have = len(found_good_to_have)
     good_to_have_score = (matched_good_to_have / max(len(good_to_have_skills), 1)) * 10 if good_to_have_skills else 0
     score += good_to_have_score
     if matched_good_to_have < len(good_to_have_skills):
-        missing_good_to_have = [skill for skill in good_to_have_skills if not any(re.search(rf'\b{skill}\b', s, re.IGNORECASE) for s in all_skills)]
+        missing_good_to_have = [skill for skill in good_to_have_skills if skill not in found_good_to_have]
         pain_points_list.append(f"Missing good-to-have skills: {', '.join(missing_good_to_have)}")
 
     # 10% Experience
-    experience_patterns = [
-        r'(\d+\.?\d*)\s*(?:year|yr|yrs|years)?\s*(?:of\s*)?(?:experience|exp)',
-        r'(\d+\.?\d*)\+?\s*(?:year|yr|yrs|years)',
-        r'over\s*(\d+\.?\d*)\s*(?:year|yr|yrs|years)',
-        r'(\d+\.?\d*)\s*to\s*\d+\.?\d*\s*(?:year|yr|yrs|years)'
-    ]
     candidate_years = 0
-    for pattern in experience_patterns:
-        match = re.search(pattern, resume_text, re.IGNORECASE)
+    for pattern in _EXPERIENCE_PATTERNS:
+        match = pattern.search(resume_text)
         if match:
             candidate_years = max(candidate_years, float(match.group(1)))
     experience_score = 10  # Default to max score if no requirement
@@ -149,9 +540,8 @@ def fallback_ats_score(resume_text: str, job_description: str, required_experien
     )
 
     # Add relevance to projects
-    for project in projects:
-        project_skills = project.get("skills", [])
-        relevant_skills = [skill for skill in mandatory_skills if any(re.search(rf'\b{skill}\b', ps, re.IGNORECASE) for ps in project_skills)]
+    for project, found_in_project in zip(projects, found_per_project):
+        relevant_skills = [skill for skill in mandatory_skills if skill in found_in_project]
         project["relevance"] = f"Matches {', '.join(relevant_skills)} requirements" if relevant_skills else "No direct match to mandatory skills"
 
     result = {
@@ -162,250 +552,127 @@ def fallback_ats_score(resume_text: str, job_description: str, required_experien
         "projects": projects
     }
 
-    logger.info(f"Fallback assessment result: {result}")
+    logger.info("Fallback assessment score %s, status %s", result["score"], result["status"])
+    logger.debug("Fallback assessment result: %s", result)
+    return result
+
+# Per-resume prompt body, built once; only the four fields change between calls
+_PROMPT_TEMPLATE = (
+    "RESUME (masked):\n{resume}\n\n"
+    "JOB REQUIREMENTS:\n{job_description}\n\n"
+    "REQUIRED YEARS OF EXPERIENCE: {required_experience}\n\n"
+    "PROJECTS:\n{projects}\n"
+)
+
+def _build_prompt(resume_text: str, job_description: str, required_experience: int, projects: List[Dict]) -> str:
+    """
+    Build the per-resume part of the technical-screening prompt.
+    The scoring rules and output format live in the model's system instruction.
+    """
+    return _PROMPT_TEMPLATE.format_map({
+        "resume": resume_text,
+        "job_description": job_description,
+        "required_experience": required_experience,
+        "projects": orjson.dumps(projects).decode() if projects else "None identified."
+    })
+
+def _parse_llm_output(output: str) -> Dict:
+    """
+    Parse schema-constrained LLM output into a technical analysis result.
+    Raises orjson.JSONDecodeError if the output is not valid JSON.
+    """
+    # Structure and types are enforced by _ANALYSIS_SCHEMA; only values need normalizing
+    result = orjson.loads(output)
+    logger.debug("Parsed technical analysis: %s", result)
+
+    # Normalize score
+    result["score"] = max(0, min(100, int(result["score"])))
+
+    # Ensure at least one pain point category has content
+    if not any(result["pain_points"][severity] for severity in ["critical", "major", "minor"]):
+        result["pain_points"]["minor"] = ["Technical evaluation completed - interview recommended"]
+
+    # Validate summary length
+    word_count = len(result["summary"].split())
+    if word_count < 120 or word_count > 170:
+        logger.warning("Technical summary length %s outside target range", word_count)
+        if word_count < 120:
+            result["summary"] += " Technical interview should focus on validating project experience and technical skills."
+
+    logger.info("Technical analysis score %s, status %s", result["score"], result["status"])
+    logger.debug("Final technical analysis: %s", result)
     return result
 
+def _screen_with_heuristic(resume_text: str, job_description: str, required_experience: int, projects: List[Dict]) -> Tuple[Dict, bool]:
+    """
+    Score the resume with the cheap heuristic. Returns the result and whether it is
+    decisive enough to skip the LLM; the result doubles as the fallback if the LLM fails.
+    The heuristic is only trusted when the job description lists mandatory skills and
+    a required experience; without them it cannot score above about 20 and would reject everyone.
+    """
+    # Score a copy so the projects sent to the LLM don't carry heuristic relevance notes
+    heuristic = fallback_ats_score(resume_text, job_description, required_experience, copy.deepcopy(projects))
+    mandatory_skills, _ = _extract_jd_skills(job_description)
+    decisive = bool(mandatory_skills) and required_experience > 0 and (
+        heuristic["score"] < _LLM_SKIP_BELOW or heuristic["score"] > _LLM_SKIP_ABOVE
+    )
+    if decisive:
+        logger.info("Heuristic score %s is decisive, skipping LLM analysis", heuristic["score"])
+        heuristic["llm_skipped"] = True
+    return heuristic, decisive
+
+def _fallback_after_error(heuristic: Dict) -> Dict:
+    """
+    Flag a heuristic result used because the LLM call failed, so callers can avoid caching it.
+    """
+    heuristic["llm_failed"] = True
+    return heuristic
+
+def _result_from_output(output: str, cache_key: str, heuristic: Dict) -> Dict:
+    """
+    Turn raw LLM output into the analysis result, falling back to the heuristic result.
+    """
+    try:
+        result = _parse_llm_output(output)
+        # Only cache results that parsed, so a bad response is retried next time
+        _analysis_cache.set(cache_key, copy.deepcopy(result))
+        return result
+    except orjson.JSONDecodeError as e:
+        logger.error("JSON decode error in technical analysis: %s", e)
+        return _fallback_after_error(heuristic)
+
 def analyze_resume(resume_text: str, job_description: str, required_experience: int, projects: List[Dict]) -> Dict:
     """
     Technical-focused resume analysis using Gemini 1.5 Flash for post-HR screening.
     Scoring: 70% projects, 10% technical skills, 10% good-to-have skills, 10% experience.
+    Clear-cut candidates are scored by the heuristic alone (flagged with "llm_skipped");
+    if the LLM call fails the heuristic result is returned flagged with "llm_failed".
     """
-    try:
-        # Construct LLM prompt
-        prompt = f"""
-            **CONTEXT:** This is a TECHNICAL SCREENING analysis for a candidate who has passed initial HR screening. 
-            Focus on technical competency, emphasizing project skills (70% of score), with technical skills (10%), 
-            good-to-have skills (10%), and experience (10%).
-
-            **MASKED RESUME DATA:**
-            {resume_text}
-
-            **JOB TECHNICAL REQUIREMENTS:**
-            {job_description}
-
-            **REQUIRED YEARS OF EXPERIENCE:**
-            {required_experience}
-
-            **EXTRACTED PROJECTS:**
-            {json.dumps(projects, indent=2) if projects else "No projects identified."}
-
-            **TECHNICAL ANALYSIS INSTRUCTIONS:**
-
-            **1. EXTRACT SKILLS FROM JOB DESCRIPTION:**
-                - **Mandatory Skills:** Identified by keywords "required", "must have", "essential", "mandatory".
-                  Extract specific skills, including tools mentioned in parentheses (e.g., "Generative AI frameworks (like GPT, BERT)" → "GPT", "BERT").
-                  Remove verbose prefixes like "Proficiency in", "Strong", "Experience with".
-                  Split skills by 'and' or commas (e.g., "Python and R" → "Python", "R").
-                - **Good-to-Have Skills:** Identified by keywords "preferred", "nice to have", "good to have".
-                - Examples: Programming languages, frameworks, cloud platforms, databases, tools.
-
-            **2. SCORE THE CANDIDATE (0-100):**
-
-                **Projects (70 points):**
-                    - Match skills in projects to mandatory skills using exact, case-insensitive matching.
-                    - Score = (Matched Project Skills / Total Mandatory Skills) × 70.
-                    - Each missing mandatory skill = critical pain point.
-
-                **Technical Skills (10 points):**
-                    - Match non-project technical skills (e.g., from Skills section) to mandatory skills.
-                    - Score = (Matched Technical Skills / Total Mandatory Skills) × 10.
-
-                **Good-to-Have Skills (10 points):**
-                    - Match any skills (from projects or elsewhere) to good-to-have skills.
-                    - Score = (Matched Good-to-Have Skills / Total Good-to-Have Skills) × 10.
-
-                **Experience (10 points):**
-                    - Extract candidate's years of experience from resume.
-                    - Compare with required years.
-                    - If required years is 0, award full points (10).
-                    - Otherwise, score = min(10, (Years Experience / Required Years) × 10).
-                    - Deduct 2 points per year below required (minimum 0).
-
-                - Cap total score at 100.
-
-            **3. TECHNICAL PAIN POINTS IDENTIFICATION:**
-
-                **Critical Issues (Immediate Concerns):**
-                    - Missing mandatory skills not covered in projects.
-                    - No relevant project experience matching job requirements.
-
-                **Major Issues (Training Required):**
-                    - Insufficient years of experience.
-                    - Limited project experience in required technologies.
-
-                **Minor Issues (Growth Opportunities):**
-                    - Missing good-to-have skills.
-                    - Could benefit from additional project exposure.
-
-            **4. TECHNICAL SUMMARY REQUIREMENTS:**
-                - Write 130-160 words focusing on:
-                    - Project alignment with mandatory skills.
-                    - Non-project technical skills and good-to-have skills.
-                    - Experience fit and gaps.
-                    - Recommendation for technical interview focus areas.
-                - For high-scoring candidates (70+): Emphasize project strengths.
-                - For moderate candidates (50-69): Highlight gaps and upskilling needs.
-                - For low-scoring candidates (<50): Note significant deficiencies.
-
-            **5. PROJECT ANALYSIS:**
-                - For each project, list:
-                    - Name
-                    - Description
-                    - Skills extracted
-                    - Relevance to mandatory skills (e.g., "Matches Python and AWS requirements").
-                - If no projects, note this and assess other sections.
-
-            **6. ASSIGN STATUS:**
-                - "Shortlisted" if score >= 70.
-                - "Under Consideration" if score is 50–69.
-                - "Rejected" if score < 50.
-
-            **OUTPUT FORMAT - Return ONLY valid JSON:**
-            {{
-                "score": <integer 0-100>,
-                "pain_points": {{
-                    "critical": [<list of critical issues>],
-                    "major": [<list of major concerns>],
-                    "minor": [<list of minor improvements>]
-                }},
-                "summary": "<130-160 words technical assessment>",
-                "status": "<Shortlisted|Under Consideration|Rejected>",
-                "projects": [
-                    {{
-                        "name": "<project name>",
-                        "description": "<description>",
-                        "skills": [<list of skills>],
-                        "relevance": "<relevance to mandatory skills>"
-                    }},
-                    ...
-                ]
-            }}
-
-            **ANALYSIS GUIDELINES:**
-                - Focus on technical competencies and job-specific requirements.
-                - Prioritize project skills (70% weight).
-                - Assess hands-on experience over theoretical knowledge.
-                - Base assessment strictly on resume content provided.
-                - Do not infer or assume unlisted skills.
-        """
-
-        response = llm.generate_content(prompt)
-        output = response.text.strip()
-        logger.info(f"Technical LLM analysis output: {output}")
-
-        # Handle potential code block markers
-        if output.startswith("```json"):
-            output = output[len("```json"):].rstrip("```").strip()
-        elif output.startswith("```"):
-            output = output[3:].rstrip("```").strip()
+    cache_key = _analysis_cache_key(resume_text, job_description, required_experience, projects)
+    cached = _analysis_cache.get(cache_key)
+    if cached is not None:
+        logger.info("Technical analysis served from cache")
+        return copy.deepcopy(cached)
 
-        # Parse and validate JSON output
-        try:
-            result = json.loads(output)
-            logger.debug(f"Parsed technical analysis: {result}")
-
-            # Validate required fields
-            required_keys = ["score", "pain_points", "summary", "status", "projects"]
-            if not all(key in result for key in required_keys):
-                missing_keys = [key for key in required_keys if key not in result]
-                logger.error(f"Technical analysis missing keys: {missing_keys}")
-                raise ValueError(f"Missing required keys: {missing_keys}")
-
-            # Validate and normalize score
-            if not isinstance(result["score"], (int, float)) or result["score"] < 0 or result["score"] > 100:
-                logger.error(f"Invalid technical score: {result['score']}")
-                raise ValueError(f"Invalid score: {result['score']}")
-            result["score"] = max(0, min(100, int(result["score"])))
-
-            # Validate pain_points
-            if not isinstance(result["pain_points"], dict):
-                logger.warning("Invalid pain_points structure, using default")
-                result["pain_points"] = {
-                    "critical": ["Technical assessment data incomplete"],
-                    "major": ["Requires detailed technical evaluation"],
-                    "minor": ["Technical interview recommended for validation"]
-                }
-            else:
-                for severity in ["critical", "major", "minor"]:
-                    if severity not in result["pain_points"]:
-                        result["pain_points"][severity] = []
-                    elif not isinstance(result["pain_points"][severity], list):
-                        result["pain_points"][severity] = [str(result["pain_points"][severity])]
-                    else:
-                        result["pain_points"][severity] = [str(item) for item in result["pain_points"][severity] if item]
-
-                # Ensure at least one category has content
-                if not any(result["pain_points"][severity] for severity in ["critical", "major", "minor"]):
-                    result["pain_points"]["minor"] = ["Technical evaluation completed - interview recommended"]
-
-            # Validate summary
-            if not isinstance(result["summary"], str):
-                logger.warning("Invalid summary format")
-                result["summary"] = generate_technical_summary(result["score"], result["pain_points"])
-            else:
-                word_count = len(result["summary"].split())
-                if word_count < 120 or word_count > 170:
-                    logger.warning(f"Technical summary length {word_count} outside target range")
-                    if word_count < 120:
-                        result["summary"] += " Technical interview should focus on validating project experience and technical skills."
-
-            # Validate status
-            if result["status"] not in ["Shortlisted", "Under Consideration", "Rejected"]:
-                logger.warning(f"Invalid status: {result['status']}, recalculating based on score")
-                score = result["score"]
-                result["status"] = "Shortlisted" if score >= 70 else "Under Consideration" if score >= 50 else "Rejected"
-
-            # Validate projects
-            if not isinstance(result["projects"], list):
-                logger.warning("Invalid projects format, using provided projects")
-                result["projects"] = projects
-            else:
-                for project in result["projects"]:
-                    if not all(key in project for key in ["name", "description", "skills", "relevance"]):
-                        logger.warning(f"Invalid project format: {project}")
-                        project.update({
-                            "name": project.get("name", "Unnamed Project"),
-                            "description": project.get("description", "No description provided"),
-                            "skills": project.get("skills", []),
-                            "relevance": project.get("relevance", "Relevance not assessed")
-                        })
-
-            logger.info(f"Final technical analysis: {result}")
-            return result
-
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON decode error in technical analysis: {e}")
-            return fallback_ats_score(resume_text, job_description, required_experience, projects)
-        except ValueError as e:
-            logger.error(f"Validation error in technical analysis: {e}")
-            return fallback_ats_score(resume_text, job_description, required_experience, projects)
+    heuristic, decisive = _screen_with_heuristic(resume_text, job_description, required_experience, projects)
+    if decisive:
+        return heuristic
 
+    try:
+        prompt = _build_prompt(resume_text, job_description, required_experience, projects)
+        output = _generate_text(prompt)
+        logger.debug("Technical LLM analysis output: %s", output)
+        return _result_from_output(output, cache_key, heuristic)
     except Exception as e:
-        logger.error(f"Technical LLM analysis failed: {e}")
-        return fallback_ats_score(resume_text, job_description, required_experience, projects)
-
-def generate_technical_summary(score: int, pain_points: Dict) -> str:
-    """
-    Generate a technical-focused summary based on score and pain points.
-    """
-    summary_parts = []
-    
-    if score >= 70:
-        summary_parts.append("Candidate demonstrates strong alignment with role requirements, particularly in project experience.")
-    elif score >= 50:
-        summary_parts.append("Candidate shows moderate fit with some gaps in project skills and experience.")
-    else:
-        summary_parts.append("Candidate exhibits significant gaps in project experience and required skills.")
-    
-    if pain_points.get("critical"):
-        summary_parts.append(f"Critical issues: {'; '.join(pain_points['critical'][:2])}.")
-    
-    if pain_points.get("major"):
-        summary_parts.append(f"Major concerns: {'; '.join(pain_points['major'][:2])}.")
-    
-    if pain_points.get("minor"):
-        summary_parts.append(f"Minor improvements: {'; '.join(pain_points['minor'][:2])}.")
-    
-    summary_parts.append("Technical interview recommended to validate project experience, assess technical skills, and determine training needs.")
-    
-    return " ".join(summary_parts)
\ No newline at end of file
+        logger.error("Technical LLM analysis failed: %s", e)
+        return _fallback_after_error(heuristic)
+
+def analyze_resumes_batch(jobs: List[Tuple[str, str, int, List[Dict]]]) -> List[Dict]:
+    """
+    Analyze several resumes in one call.
+    Each job is a (resume_text, job_description, required_experience, projects) tuple;
+    results are returned in the same order as the jobs.
+    Requests run concurrently on the shared worker pool, paced to the GEMINI_RPM
+    quota, and rate-limit errors are retried with backoff per request.
+    """
+    return list(_EXECUTOR.map(lambda job: analyze_resume(*job), jobs))
@@ -1,50 +1,132 @@
 from flask import Flask, request, render_template, jsonify, send_from_directory
 import uuid
 import os
+import time
+import threading
+import json
+import copy
+import hashlib
+from io import BytesIO
+from datetime import datetime, timezone
+import atexit
+import queue
+from concurrent.futures import ThreadPoolExecutor
 import logging
+from logging.handlers import QueueHandler, QueueListener
 import re
 from dotenv import load_dotenv
 from werkzeug.utils import secure_filename
-from document_parser import parse_document
 from masking_agent import mask_text
-from agents import analyze_resume
-from pymongo import MongoClient
-import google.generativeai as genai
+from name_heuristics import extract_name_heuristic, NAME_EXCERPT_CHARS
+from pii_store_mongo import get_mongo_client, ensure_indexes as ensure_pii_indexes, REQUEST_TIMEOUT_SECONDS
+from agents import analyze_resumes_batch, configure_gemini, get_llm, GEMINI_MODEL_NAME, LRUCache
+import pymongo
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import OperationFailure
+from pymongo.write_concern import WriteConcern
+from google.api_core.exceptions import DeadlineExceeded
 
 app = Flask(__name__, static_folder='frontend/build/static', template_folder='templates')
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB limit
+os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+# Build assets are content-hashed (main.<hash>.js), so Flask's static route can let browsers cache them for a year
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 365 * 24 * 3600
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    filename="app_logs.txt",
-    format="%(asctime)s - %(levelname)s - %(message)s",
-)
+# Shared worker pool for per-request concurrent work, reused across requests
+executor = ThreadPoolExecutor(max_workers=int(os.getenv("ATS_WORKERS", "8")), thread_name_prefix="analyze")
+
+# Set up logging: request threads only enqueue records, and a background
+# listener thread does the file writes
+log_queue = queue.Queue(-1)
+log_file_handler = logging.FileHandler("app_logs.txt")
+log_file_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+log_listener = QueueListener(log_queue, log_file_handler)
+log_listener.start()
+atexit.register(log_listener.stop)
+logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(log_queue)])
 logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
 logger.info("Environment variables loaded: GOOGLE_API_KEY present=%s", "GOOGLE_API_KEY" in os.environ)
 
+# MongoDB error code for an existing index created with different options
+INDEX_OPTIONS_CONFLICT = 85
+
+def ensure_ttl_index(collection, field: str, expire_after_seconds: int) -> None:
+    """
+    Create a TTL index on field, or update the expiry of an existing one when the
+    configured TTL has changed (create_index refuses to change index options).
+    """
+    try:
+        collection.create_index([(field, ASCENDING)], expireAfterSeconds=expire_after_seconds)
+    except OperationFailure as e:
+        if e.code != INDEX_OPTIONS_CONFLICT:
+            raise
+        collection.database.command("collMod", collection.name, index={"keyPattern": {field: 1}, "expireAfterSeconds": expire_after_seconds})
+        logger.info("Updated TTL index on %s.%s to %s seconds", collection.name, field, expire_after_seconds)
+
 # Initialize MongoDB connection
 try:
-    client = MongoClient(os.getenv("MONGO_URI"))
+    client = get_mongo_client()
     db = client["ats_system"]
-    resume_collection = db["resumes"]
+    # Acknowledged writes without waiting for the journal flush on each insert
+    resume_collection = db.get_collection("resumes", write_concern=WriteConcern(w=1, j=False))
+    resume_collection.create_index([("resume_id", ASCENDING)], unique=True)
+    ensure_pii_indexes()
+    # Optional retention: with RESUME_TTL_DAYS set, MongoDB expires resumes that long after cached_at
+    if os.getenv("RESUME_TTL_DAYS"):
+        ensure_ttl_index(resume_collection, "cached_at", int(os.getenv("RESUME_TTL_DAYS")) * 86400)
+    # Cached candidate names expire after NAME_CACHE_TTL_DAYS
+    name_cache_collection = db["candidate_name_cache"]
+    ensure_ttl_index(name_cache_collection, "cached_at", int(os.getenv("NAME_CACHE_TTL_DAYS", "30")) * 86400)
     logger.info("MongoDB connection successful.")
 except Exception as e:
-    logger.error(f"MongoDB connection failed: {e}")
+    logger.error("MongoDB connection failed: %s", e)
     exit(1)
 
-# Configure Google Gemini API
-try:
-    genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-    model = genai.GenerativeModel("gemini-1.5-flash")
-    logger.info("Google Gemini API configured successfully.")
-except Exception as e:
-    logger.error(f"Failed to configure Gemini API: {e}")
-    exit(1)
+# The Gemini SDK and the document parsers are imported on first use (or by the
+# background prewarm below), so the worker starts serving without waiting on them
+if not os.getenv("GOOGLE_API_KEY"):
+    logger.warning("GOOGLE_API_KEY is not set; Gemini calls will fail and fall back to heuristics")
+
+name_model = None
+name_model_lock = threading.Lock()
+
+def get_name_model():
+    """
+    Return the shared name-extraction model, creating it on first use.
+    Gemini is configured once in agents; this model reuses that shared client.
+    """
+    global name_model
+    if name_model is None:
+        configure_gemini()
+        with name_model_lock:
+            if name_model is None:
+                import google.generativeai as genai
+                name_model = genai.GenerativeModel(GEMINI_MODEL_NAME, system_instruction=_NAME_INSTRUCTIONS)
+                logger.info("Google Gemini model for name extraction ready.")
+    return name_model
+
+def parse_upload(file_bytes: bytes, filename: str) -> dict:
+    from document_parser import parse_document
+    return parse_document(BytesIO(file_bytes), filename)
+
+def prewarm() -> None:
+    """
+    Load the Gemini SDK, both models and the document parsers ahead of the first request.
+    """
+    try:
+        get_name_model()
+        get_llm()
+        import document_parser  # noqa: F401
+    except Exception as e:
+        logger.error("Prewarm failed, components will load on first use: %s", e)
+
+# Required-experience patterns, compiled once
+_EXPERIENCE_RANGE_PATTERN = re.compile(r'(\d+)-(\d+)\s*(?:years?|yrs?)\s*(?:of\s*)?(?:experience)', re.IGNORECASE)  # e.g., '3-5 years of experience'
+_EXPERIENCE_SINGLE_PATTERN = re.compile(r'(\d+)\s*(?:\+|-)?\s*(?:years?|yrs?)\s*(?:of\s*)?(?:experience)', re.IGNORECASE)  # e.g., '3 years of experience', '5+ years'
 
 def extract_required_experience(job_description: str) -> int:
     """
@@ -52,83 +134,281 @@ def extract_required_experience(job_description: str) -> int:
     Looks for patterns like 'X years of experience', 'X+ years', etc.
     Returns 0 if no experience requirement is found.
     """
-    patterns = [
-        r'(\d+)\s*(?:\+|-)?\s*(?:years?|yrs?)\s*(?:of\s*)?(?:experience)',  # e.g., '3 years of experience', '5+ years'
-        r'(\d+)-(\d+)\s*(?:years?|yrs?)\s*(?:of\s*)?(?:experience)'         # e.g., '3-5 years of experience'
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, job_description, re.IGNORECASE)
-        if match:
-            if pattern == patterns[1]:  # Range like '3-5 years'
-                lower, upper = int(match.group(1)), int(match.group(2))
-                return lower  # Take the lower bound as the minimum requirement
-            else:  # Single value like '3 years'
-                return int(match.group(1))
-    
+    # Ranges are checked first; otherwise the single-value pattern would match the upper bound of "3-5 years"
+    match = _EXPERIENCE_RANGE_PATTERN.search(job_description)
+    if match:
+        return int(match.group(1))  # Take the lower bound as the minimum requirement
+    match = _EXPERIENCE_SINGLE_PATTERN.search(job_description)
+    if match:
+        return int(match.group(1))
+
     logger.warning("No experience requirement found in job description, defaulting to 0 years.")
     return 0
 
-def store_resume_in_mongo(resume_id: str, masked_text: str, mappings: dict, collection_id: str) -> dict:
-    resume_data = {
+def build_resume_document(resume_id: str, masked_text: str, mappings: dict, collection_id: str) -> dict:
+    return {
         "resume_id": resume_id,
         "masked_text": masked_text,
         "pii_mappings": mappings,
         "pii_collection_id": collection_id,
+        "cached_at": datetime.now(timezone.utc),
     }
-    resume_collection.insert_one(resume_data)
-    logger.info(f"Stored resume with ID: {resume_id}")
-    return resume_data
+
+# Resume documents are written by a background thread: requests only enqueue them,
+# and the writer flushes up to RESUME_WRITE_BATCH documents (or whatever arrived
+# within RESUME_WRITE_INTERVAL seconds) per acknowledged insert_many
+RESUME_WRITE_BATCH = 100
+RESUME_WRITE_INTERVAL = 0.5
+resume_write_queue = queue.Queue()
+
+def write_resume_batch(resume_docs: list) -> None:
+    """
+    Insert a batch of resumes, unordered so one failing document does not stop the rest.
+    """
+    try:
+        resume_collection.insert_many(resume_docs, ordered=False)
+        logger.info("Stored resumes with IDs: %s", [doc["resume_id"] for doc in resume_docs])
+    except Exception as e:
+        logger.error("Failed to store resumes %s: %s", [doc["resume_id"] for doc in resume_docs], e)
+
+# Queued by the exit handler; the writer flushes its current batch and stops
+RESUME_WRITER_STOP = object()
+
+def resume_writer() -> None:
+    while True:
+        doc = resume_write_queue.get()
+        if doc is RESUME_WRITER_STOP:
+            return
+        batch = [doc]
+        deadline = time.monotonic() + RESUME_WRITE_INTERVAL
+        stopping = False
+        while len(batch) < RESUME_WRITE_BATCH:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                doc = resume_write_queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if doc is RESUME_WRITER_STOP:
+                stopping = True
+                break
+            batch.append(doc)
+        write_resume_batch(batch)
+        if stopping:
+            return
+
+resume_writer_thread = threading.Thread(target=resume_writer, name="resume-writer", daemon=True)
+resume_writer_thread.start()
+
+def flush_resume_writes() -> None:
+    """
+    Stop the writer after it has stored everything queued, including the batch
+    it is collecting or inserting; registered to run at exit.
+    """
+    resume_write_queue.put(RESUME_WRITER_STOP)
+    resume_writer_thread.join()
+
+atexit.register(flush_resume_writes)
+
+def store_resumes_in_mongo(resume_docs: list) -> None:
+    """
+    Queue resumes for the background writer without waiting on MongoDB.
+    """
+    for doc in resume_docs:
+        resume_write_queue.put(doc)
+
+# Fixed name-extraction rules, sent once as the name model's system instruction
+_NAME_INSTRUCTIONS = (
+    "You are an expert in resume analysis. You are given resume text with sensitive information masked (e.g., [ADDRESS], [PHONE], [EMAIL]). "
+    "Your task is to identify and extract only the candidate's full name (first and last name, and optionally middle name or initial). "
+    "The name is typically found at the top of the resume or in a 'Name' field. "
+    "Do not extract any other information, such as job titles, technical terms, or masked data. "
+    "If no clear name is found, return 'Unknown Candidate'. "
+)
+
+# Candidate name and analysis per (resume file, job description), keyed on the raw
+# uploads because masking assigns fresh placeholders on every run
+resume_result_cache = LRUCache(maxsize=1024, ttl_seconds=7 * 24 * 3600)
+
+def resume_result_cache_key(file_bytes: bytes, job_description_source: bytes) -> str:
+    return hashlib.blake2b(file_bytes).hexdigest() + "|" + hashlib.blake2b(job_description_source).hexdigest()
+
+# Name prompts only carry the opening NAME_EXCERPT_CHARS characters of a resume,
+# without PII placeholders such as <PHONE_1234>
+MASK_TOKEN_PATTERN = re.compile(r'<[A-Z]+_\d+>')
+
+def name_prompt_excerpt(masked_text: str) -> str:
+    return MASK_TOKEN_PATTERN.sub('', masked_text[:NAME_EXCERPT_CHARS]).strip()
+
+# Extracted names keyed by a hash of the name excerpt (which excludes the per-run
+# mask placeholders): in process first, then in Mongo so they survive restarts
+name_cache = LRUCache(maxsize=4096)
+
+def name_cache_key(masked_text: str) -> str:
+    return hashlib.sha256(name_prompt_excerpt(masked_text).encode("utf-8")).hexdigest()
+
+def lookup_cached_names(keys: list) -> list:
+    names = [name_cache.get(key) for key in keys]
+    missing = [key for key, name in zip(keys, names) if name is None]
+    if missing:
+        try:
+            with pymongo.timeout(REQUEST_TIMEOUT_SECONDS):
+                stored = {doc["_id"]: doc["candidate_name"] for doc in name_cache_collection.find({"_id": {"$in": missing}}, {"candidate_name": 1})}
+        except Exception as e:
+            logger.error("Name cache lookup failed: %s", e)
+            stored = {}
+        for i, key in enumerate(keys):
+            if names[i] is None and key in stored:
+                names[i] = stored[key]
+                name_cache.set(key, stored[key])
+    return names
+
+def store_cached_names(names_by_key: dict) -> None:
+    if not names_by_key:
+        return
+    now = datetime.now(timezone.utc)
+    for key, name in names_by_key.items():
+        name_cache.set(key, name)
+    try:
+        with pymongo.timeout(REQUEST_TIMEOUT_SECONDS):
+            name_cache_collection.bulk_write([
+                UpdateOne({"_id": key}, {"$set": {"candidate_name": name, "cached_at": now}}, upsert=True)
+                for key, name in names_by_key.items()
+            ], ordered=False)
+    except Exception as e:
+        logger.error("Name cache write failed: %s", e)
+
+# Resumes per batched name-extraction call
+NAME_BATCH_SIZE = int(os.getenv("NAME_BATCH_SIZE", "8"))
+
+# Per-attempt deadlines for name extraction; one retry with a longer deadline
+NAME_TIMEOUTS_SECONDS = (8.0, 15.0)
+
+def generate_name_response(prompt: str, **kwargs):
+    """
+    Call the name model, retrying once with a longer deadline if the first call times out.
+    """
+    for attempt, timeout in enumerate(NAME_TIMEOUTS_SECONDS, 1):
+        try:
+            return get_name_model().generate_content(prompt, request_options={"timeout": timeout}, **kwargs)
+        except DeadlineExceeded:
+            if attempt == len(NAME_TIMEOUTS_SECONDS):
+                raise
+            logger.warning("Name extraction timed out after %.0fs, retrying", timeout)
+
+def validate_candidate_name(candidate_name: str) -> str:
+    candidate_name = candidate_name.strip()
+    if not candidate_name or len(candidate_name.split()) < 2 or len(candidate_name) > 30:
+        logger.warning("No valid candidate name found by LLM, using 'Unknown Candidate'")
+        return "Unknown Candidate"
+    logger.info("Candidate name extracted via LLM: %s", candidate_name)
+    return candidate_name
 
 def get_candidate_name(masked_text: str) -> str:
     try:
         prompt = (
-            "You are an expert in resume analysis. The following text is a resume with sensitive information masked (e.g., [ADDRESS], [PHONE], [EMAIL]). "
-            "Your task is to identify and extract only the candidate's full name (first and last name, and optionally middle name or initial). "
-            "The name is typically found at the top of the resume or in a 'Name' field. "
-            "Do not extract any other information, such as job titles, technical terms, or masked data. "
-            "If no clear name is found, return 'Unknown Candidate'. "
             "Return only the name as a string, nothing else.\n\n"
-            f"{masked_text[:2000]}"
+            f"{name_prompt_excerpt(masked_text)}"
         )
-        response = model.generate_content(prompt)
-        candidate_name = response.text.strip()
-        if not candidate_name or len(candidate_name.split()) < 2 or len(candidate_name) > 30:
-            logger.warning("No valid candidate name found by LLM, using 'Unknown Candidate'")
-            return "Unknown Candidate"
-        logger.info(f"Candidate name extracted via LLM: {candidate_name}")
-        return candidate_name
+        response = generate_name_response(prompt)
+        return validate_candidate_name(response.text)
     except Exception as e:
-        logger.error(f"Error extracting name with LLM: {e}")
+        logger.error("Error extracting name with LLM: %s", e)
         return "Unknown Candidate"
 
+def get_candidate_names_batch(masked_texts: list) -> list:
+    """
+    Extract candidate names for several resumes, serving repeats from the name cache
+    and asking Gemini for the rest in one call.
+    """
+    keys = [name_cache_key(text) for text in masked_texts]
+    names = lookup_cached_names(keys)
+    missing = [i for i, name in enumerate(names) if name is None]
+    if missing:
+        fresh_names = request_candidate_names([masked_texts[i] for i in missing])
+        for i, name in zip(missing, fresh_names):
+            names[i] = name
+        # "Unknown Candidate" may come from a failed call, so it is never cached
+        store_cached_names({keys[i]: names[i] for i in missing if names[i] != "Unknown Candidate"})
+    return names
+
+def request_candidate_names(masked_texts: list) -> list:
+    """
+    Extract candidate names for several resumes with one Gemini call.
+    Falls back to one call per resume if the batched answer is unusable.
+    """
+    if len(masked_texts) == 1:
+        return [get_candidate_name(masked_texts[0])]
+    try:
+        sections = "".join(f"=== RESUME {i} ===\n{name_prompt_excerpt(text)}\n\n" for i, text in enumerate(masked_texts, 1))
+        prompt = (
+            f"Apply this to each of the {len(masked_texts)} resumes below. "
+            "Return only a JSON array of strings with one name per resume, in the same order.\n\n"
+            f"{sections}"
+        )
+        response = generate_name_response(prompt, generation_config={"response_mime_type": "application/json"})
+        names = json.loads(response.text)
+        if not isinstance(names, list) or len(names) != len(masked_texts):
+            raise ValueError(f"Expected {len(masked_texts)} names, got {names!r}")
+        return [validate_candidate_name(str(name)) for name in names]
+    except Exception as e:
+        logger.error("Batched name extraction failed, extracting one by one: %s", e)
+        return [get_candidate_name(text) for text in masked_texts]
+
+# Parsed and masked resumes keyed by file content, so a re-submitted resume skips PDF
+# extraction and NLP masking and reuses its already stored PII mappings
+parsed_resume_cache = LRUCache(maxsize=256)
+
+def prepare_resume(filename: str, file_bytes: bytes) -> tuple:
+    """
+    Parse and mask one uploaded resume from memory, keeping a copy on disk for download.
+    Returns (filename, masked_text, projects, resume_document).
+    """
+    with open(os.path.join(app.config['UPLOAD_FOLDER'], filename), 'wb') as f:
+        f.write(file_bytes)
+    cache_key = hashlib.blake2b(file_bytes).hexdigest() + os.path.splitext(filename)[1]
+    cached = parsed_resume_cache.get(cache_key)
+    if cached is None:
+        resume_data = parse_upload(file_bytes, filename)
+        cached = (*mask_text(resume_data["full_text"]), resume_data["projects"])
+        parsed_resume_cache.set(cache_key, cached)
+    masked_text, mappings, collection_id, projects = cached
+    resume_doc = build_resume_document(str(uuid.uuid4()), masked_text, dict(mappings), collection_id)
+    return filename, masked_text, copy.deepcopy(projects), resume_doc
+
+# Build asset filenames per static directory, keyed by the directory's mtime so a
+# new frontend build is picked up without listing the directory on every page load
+static_asset_cache = {}
+
+def find_main_assets(directory: str, extension: str) -> list:
+    try:
+        mtime = os.stat(directory).st_mtime_ns
+    except FileNotFoundError:
+        return []
+    cached = static_asset_cache.get(directory)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with os.scandir(directory) as entries:
+        files = [entry.name for entry in entries if entry.name.startswith('main.') and entry.name.endswith(extension)]
+    static_asset_cache[directory] = (mtime, files)
+    return files
+
 @app.route('/')
 def index():
     logger.info("Attempting to render index.html")
     template_path = os.path.join(app.template_folder, 'index.html')
     if not os.path.exists(template_path):
-        logger.error(f"Template not found at: {template_path}")
+        logger.error("Template not found at: %s", template_path)
         return jsonify({"error": "Template index.html not found"}), 500
     
-    js_files = []
-    css_files = []
-    static_js_path = os.path.join(app.static_folder, 'js')
-    static_css_path = os.path.join(app.static_folder, 'css')
-    
-    if os.path.exists(static_js_path):
-        js_files = [f for f in os.listdir(static_js_path) if f.endswith('.js') and 'main.' in f]
-    if os.path.exists(static_css_path):
-        css_files = [f for f in os.listdir(static_css_path) if f.endswith('.css') and 'main.' in f]
+    js_files = find_main_assets(os.path.join(app.static_folder, 'js'), '.js')
+    css_files = find_main_assets(os.path.join(app.static_folder, 'css'), '.css')
     
     if not js_files:
         logger.error("No main.js file found in static/js")
         return jsonify({"error": "No main.js file found"}), 500
     
-    import time
-    cache_buster = int(time.time())
-    js_files = [f"{f}?v={cache_buster}" for f in js_files]
-    css_files = [f"{f}?v={cache_buster}" for f in css_files]
-    
     return render_template('index.html', js_files=js_files, css_files=css_files)
 
 @app.route('/analyze', methods=['POST'])
@@ -144,17 +424,17 @@ def analyze_resumes():
         # Process job description
         if job_description_file and job_description_file.filename.endswith(('.pdf', '.docx')):
             filename = secure_filename(job_description_file.filename)
-            job_description_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            job_description_file.save(job_description_path)
-            logger.info(f"Processing job description file: {filename}")
-            
-            with open(job_description_path, 'rb') as f:
-                jd_data = parse_document(f, filename)
+            logger.info("Processing job description file: %s", filename)
+
+            # The job description is never served back, so it is parsed in memory without a disk copy
+            job_description_source = job_description_file.read()
+            jd_data = parse_upload(job_description_source, filename)
             job_description = jd_data["full_text"]
             job_description, _, _ = mask_text(job_description)
             logger.info("Job description extracted and masked from uploaded file")
         else:
             job_description = job_description_text
+            job_description_source = job_description_text.encode("utf-8")
             if job_description.strip():
                 job_description, _, _ = mask_text(job_description)
                 logger.info("Job description used from text input and masked")
@@ -163,56 +443,86 @@ def analyze_resumes():
 
         # Extract required experience from job description
         required_experience = extract_required_experience(job_description)
-        results = []
-
-        if not os.path.exists(app.config['UPLOAD_FOLDER']):
-            os.makedirs(app.config['UPLOAD_FOLDER'])
 
+        # Read uploads on the request thread, then save, parse and mask every resume
+        # concurrently on the shared pool and store them all in one batch
+        uploads = []
         for resume in resumes:
             if resume and resume.filename.endswith(('.pdf', '.docx')):
                 filename = secure_filename(resume.filename)
-                resume_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                resume.save(resume_path)
-                logger.info(f"Processing resume: {filename}")
-                
-                with open(resume_path, 'rb') as f:
-                    resume_data = parse_document(f, filename)
-                    resume_text = resume_data["full_text"]
-                    projects = resume_data["projects"]
-                masked_text, mappings, collection_id = mask_text(resume_text)
-                candidate_name = get_candidate_name(masked_text)
-                resume_id = str(uuid.uuid4())
-                store_resume_in_mongo(resume_id, masked_text, mappings, collection_id)
-                result = analyze_resume(masked_text, job_description, required_experience, projects)
-                
-                results.append({
-                    "resume_name": filename,
-                    "candidate_name": candidate_name,
-                    "score": result["score"],
-                    "pain_points": result["pain_points"],
-                    "summary": result["summary"],
-                    "status": result["status"],
-                    "projects": result["projects"],
-                    "resume_path": f"/uploads/{filename}"
-                })
+                logger.info("Processing resume: %s", filename)
+                uploads.append((filename, resume.read()))
+        prepared = list(executor.map(lambda item: prepare_resume(*item), uploads))
+        # Stored by the background writer while names and analyses are produced
+        store_resumes_in_mongo([resume_doc for _, _, _, resume_doc in prepared])
+
+        # Resumes already analyzed against this job description are served from cache,
+        # and identical files in this upload are analyzed only once
+        cache_keys = [resume_result_cache_key(file_bytes, job_description_source) for _, file_bytes in uploads]
+        cached = [resume_result_cache.get(key) for key in cache_keys]
+        pending = []
+        duplicates = []
+        first_index = {}
+        for i, entry in enumerate(cached):
+            if entry is not None:
+                continue
+            if cache_keys[i] in first_index:
+                duplicates.append((i, first_index[cache_keys[i]]))
+            else:
+                first_index[cache_keys[i]] = i
+                pending.append(i)
+
+        # Name extraction is independent of the technical analysis, so it runs
+        # in the background, NAME_BATCH_SIZE resumes per call, while all resumes
+        # are scored in one batch
+        filenames = [filename for filename, _, _, _ in prepared]
+        # Plainly formatted names are read off the first lines; only the rest go to Gemini
+        candidate_names = [extract_name_heuristic(prepared[i][1]) for i in pending]
+        unnamed = [k for k, name in enumerate(candidate_names) if name is None]
+        masked_texts = [prepared[pending[k]][1] for k in unnamed]
+        name_futures = [
+            executor.submit(get_candidate_names_batch, masked_texts[i:i + NAME_BATCH_SIZE])
+            for i in range(0, len(masked_texts), NAME_BATCH_SIZE)
+        ]
+        jobs = [(prepared[i][1], job_description, required_experience, prepared[i][2]) for i in pending]
+
+        # Both helpers handle their own failures (default name / fallback score)
+        analyses = analyze_resumes_batch(jobs)
+        llm_names = [name for future in name_futures for name in future.result()]
+        for k, name in zip(unnamed, llm_names):
+            candidate_names[k] = name
+        for i, candidate_name, result in zip(pending, candidate_names, analyses):
+            cached[i] = (candidate_name, result)
+            if not result.get("llm_failed"):
+                resume_result_cache.set(cache_keys[i], cached[i])
+        for i, original in duplicates:
+            cached[i] = cached[original]
+
+        results = []
+        for filename, (candidate_name, result) in zip(filenames, cached):
+            results.append({
+                "resume_name": filename,
+                "candidate_name": candidate_name,
+                "score": result["score"],
+                "pain_points": result["pain_points"],
+                "summary": result["summary"],
+                "status": result["status"],
+                "projects": result["projects"],
+                "resume_path": f"/uploads/{filename}"
+            })
 
         return jsonify(results)
     except Exception as e:
-        logger.error(f"Error in analyze_resumes: {e}")
+        logger.error("Error in analyze_resumes: %s", e)
         return jsonify({"error": str(e)}), 500
 
 @app.route('/uploads/<filename>')
 def download_resume(filename):
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename, as_attachment=True)
-
-@app.route('/static/<path:path>')
-def serve_static(path):
-    response = send_from_directory(app.static_folder, path)
-    response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
-    response.headers['Pragma'] = 'no-cache'
-    response.headers['Expires'] = '0'
-    logger.info(f"Serving static file: {path}")
-    return response
+    # Uploaded files can be replaced under the same name, so downloads are never cached
+    return send_from_directory(app.config['UPLOAD_FOLDER'], filename, as_attachment=True, max_age=0)
+
+# Started last so everything prewarm touches (e.g. _NAME_INSTRUCTIONS) is already defined
+threading.Thread(target=prewarm, name="prewarm", daemon=True).start()
 
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
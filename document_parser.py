@@ -1,13 +1,95 @@
 import logging
+from bisect import bisect_left
 from io import BytesIO
 import re
+import threading
 from typing import Dict, List
 import docx2txt
 import PyPDF2
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+# PDFium is not thread-safe, even across separate documents, and resumes are parsed concurrently
+_PDFIUM_LOCK = threading.Lock()
 
-logging.basicConfig(level=logging.INFO, filename='logs.txt', format='%(asctime)s - %(levelname)s - %(message)s')
+# Logging is configured by the application entry point (app.py)
 logger = logging.getLogger(__name__)
 
+# Technologies recognised in project descriptions
+SKILL_KEYWORDS = [
+    'Python', 'Java', 'JavaScript', 'React', 'Node.js', 'AWS', 'Docker', 'Kubernetes',
+    'GCP', 'Azure', 'Terraform', 'CI/CD', 'Git', 'SQL', 'MongoDB', 'Redis',
+    'GraphQL', 'Microservices', 'DevOps', 'Machine Learning', 'TensorFlow', 'PyTorch'
+]
+_SKILL_BY_LOWER = {skill.lower(): skill for skill in SKILL_KEYWORDS}
+# All keywords in one alternation, longest first, so each line is scanned once
+_SKILL_KEYWORDS_PATTERN = re.compile(
+    r'\b(' + '|'.join(re.escape(skill) for skill in sorted(SKILL_KEYWORDS, key=len, reverse=True)) + r')\b',
+    re.IGNORECASE
+)
+
+# Section and project patterns, compiled once. A section runs from its first header
+# keyword up to the next "\nHeading:" line (or the end of the text).
+_SECTION_KEYWORD_PATTERN = re.compile(r'(Projects|Experience|Work\s+History|Skills)', re.IGNORECASE)
+_SECTION_BOUNDARY_PATTERN = re.compile(r'\n(?=[A-Z][a-zA-Z\s]+:)', re.IGNORECASE)
+_PROJECT_ENTRY_SPLIT_PATTERN = re.compile(r'\n\s*(?=[A-Za-z0-9\s\-]+(?:\s*\d{4}\s*(?:[-–]\s*(?:Present|\d{4}))?)?\s*(?=\n\s*[-•]))')
+_PROJECT_NAME_PATTERN = re.compile(r'^(.*?)(?:\s*[-–]\s*\d{4}(?:\s*[-–]\s*(?:Present|\d{4}))?)?$')
+
+def extract_pdf_text(data: bytes) -> str:
+    """
+    Extract the text of every page of a PDF, one newline after each page.
+    Uses PDFium (native) when available and falls back to PyPDF2.
+    """
+    if pdfium is not None:
+        try:
+            with _PDFIUM_LOCK:
+                pdf = pdfium.PdfDocument(data)
+                try:
+                    pages = []
+                    for i in range(len(pdf)):
+                        page = pdf[i]
+                        try:
+                            textpage = page.get_textpage()
+                            try:
+                                pages.append(textpage.get_text_range() + "\n")
+                            finally:
+                                textpage.close()
+                        finally:
+                            page.close()
+                    return "".join(pages)
+                finally:
+                    pdf.close()
+        except Exception as e:
+            logger.warning("PDFium text extraction failed, falling back to PyPDF2: %s", e)
+    reader = PyPDF2.PdfReader(BytesIO(data))
+    return "".join((page.extract_text() or "") + "\n" for page in reader.pages)
+
+def extract_sections(text: str) -> Dict[str, str]:
+    """
+    Find the projects, skills and experience sections of a document in one pass.
+    "projects" starts at the first Projects, Experience or Work History keyword.
+    """
+    boundaries = [match.start() for match in _SECTION_BOUNDARY_PATTERN.finditer(text)]
+    sections = {}
+    for match in _SECTION_KEYWORD_PATTERN.finditer(text):
+        keyword = match.group(1).lower()
+        names = ["projects"]
+        if keyword == "skills":
+            names = ["skills"]
+        elif keyword == "experience":
+            names.append("experience")
+        names = [name for name in names if name not in sections]
+        if not names:
+            continue
+        index = bisect_left(boundaries, match.end())
+        end = boundaries[index] if index < len(boundaries) else len(text)
+        for name in names:
+            sections[name] = text[match.end():end]
+        if len(sections) == 3:
+            break
+    return sections
+
 def parse_document(file: BytesIO, filename: str) -> Dict:
     """
     Parse a PDF or DOCX file and extract structured content.
@@ -16,54 +98,49 @@ def parse_document(file: BytesIO, filename: str) -> Dict:
     try:
         full_text = ""
         projects = []
+        # Read the upload once; each parser gets the bytes or its own in-memory stream
+        data = file.read()
 
         if filename.endswith('.pdf'):
-            reader = PyPDF2.PdfReader(file)
-            for page in reader.pages:
-                text = page.extract_text() or ""
-                full_text += text + "\n"
-            logger.info(f"Extracted {len(full_text)} characters from PDF {filename}")
+            full_text = extract_pdf_text(data)
+            logger.info("Extracted %s characters from PDF %s", len(full_text), filename)
 
         elif filename.endswith('.docx'):
-            full_text = docx2txt.process(file)
-            logger.info(f"Successfully extracted {len(full_text)} characters from DOCX {filename}")
+            full_text = docx2txt.process(BytesIO(data))
+            logger.info("Successfully extracted %s characters from DOCX %s", len(full_text), filename)
 
         else:
-            logger.error(f"Unsupported file format: {filename}")
+            logger.error("Unsupported file format: %s", filename)
             raise ValueError("Unsupported file format. Only PDF and DOCX are supported.")
 
-        # Basic structuring of the document
-        structured_text = "[SECTION: General]\n" + full_text
+        # Basic structuring of the document; pieces are joined once at the end
+        structured_parts = ["[SECTION: General]\n", full_text]
+
+        sections = extract_sections(full_text)
 
         # Extract projects (mainly for resumes, may not apply to job descriptions)
-        project_section = re.search(r'(?:Projects|Experience|Work\s+History)(.*?)(?=\n[A-Z][a-zA-Z\s]+:|\Z)', full_text, re.DOTALL | re.IGNORECASE)
-        if project_section:
-            project_text = project_section.group(1).strip()
-            project_entries = re.split(r'\n\s*(?=[A-Za-z0-9\s\-]+(?:\s*\d{4}\s*(?:[-–]\s*(?:Present|\d{4}))?)?\s*(?=\n\s*[-•]))', project_text)
-            structured_text += "\n[SECTION: Projects]\n"
+        if "projects" in sections:
+            project_text = sections["projects"].strip()
+            project_entries = _PROJECT_ENTRY_SPLIT_PATTERN.split(project_text)
+            structured_parts.append("\n[SECTION: Projects]\n")
             
             for entry in project_entries:
                 entry = entry.strip()
                 if entry:
-                    structured_text += f"PROJECT ENTRY: {entry}\n"
+                    structured_parts.append(f"PROJECT ENTRY: {entry}\n")
                     # Extract project details
                     lines = entry.split('\n')
                     name_line = lines[0].strip()
-                    name_match = re.match(r'^(.*?)(?:\s*[-–]\s*\d{4}(?:\s*[-–]\s*(?:Present|\d{4}))?)?$', name_line)
+                    name_match = _PROJECT_NAME_PATTERN.match(name_line)
                     project_name = name_match.group(1).strip() if name_match else "Unnamed Project"
                     description = "\n".join(line.strip() for line in lines[1:] if line.strip())
                     
-                    # Extract skills from description
-                    skill_keywords = [
-                        'Python', 'Java', 'JavaScript', 'React', 'Node.js', 'AWS', 'Docker', 'Kubernetes',
-                        'GCP', 'Azure', 'Terraform', 'CI/CD', 'Git', 'SQL', 'MongoDB', 'Redis',
-                        'GraphQL', 'Microservices', 'DevOps', 'Machine Learning', 'TensorFlow', 'PyTorch'
-                    ]
+                    # Extract skills from description: one scan per line, then add the
+                    # line's keywords in SKILL_KEYWORDS order
                     skills = []
                     for line in lines[1:]:
-                        for skill in skill_keywords:
-                            if re.search(rf'\b{skill}\b', line, re.IGNORECASE) and skill not in skills:
-                                skills.append(skill)
+                        found = {_SKILL_BY_LOWER[match.lower()] for match in _SKILL_KEYWORDS_PATTERN.findall(line)}
+                        skills.extend(skill for skill in SKILL_KEYWORDS if skill in found and skill not in skills)
                     
                     projects.append({
                         "name": project_name,
@@ -72,20 +149,18 @@ def parse_document(file: BytesIO, filename: str) -> Dict:
                     })
 
         # Extract skills section (if present)
-        skills_section = re.search(r'Skills(.*?)(?=\n[A-Z][a-zA-Z\s]+:|\Z)', full_text, re.DOTALL | re.IGNORECASE)
-        if skills_section:
-            structured_text += "\n[SECTION: Skills]\n" + skills_section.group(1).strip()
+        if "skills" in sections:
+            structured_parts.append("\n[SECTION: Skills]\n" + sections["skills"].strip())
 
         # Extract experience section for years of experience
-        experience_section = re.search(r'Experience(.*?)(?=\n[A-Z][a-zA-Z\s]+:|\Z)', full_text, re.DOTALL | re.IGNORECASE)
-        if experience_section:
-            structured_text += "\n[SECTION: Experience]\n" + experience_section.group(1).strip()
+        if "experience" in sections:
+            structured_parts.append("\n[SECTION: Experience]\n" + sections["experience"].strip())
 
         return {
-            "full_text": structured_text,
+            "full_text": "".join(structured_parts),
             "projects": projects
         }
 
     except Exception as e:
-        logger.error(f"Error parsing document {filename}: {e}")
+        logger.error("Error parsing document %s: %s", filename, e)
         raise
\ No newline at end of file
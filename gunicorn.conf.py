@@ -0,0 +1,13 @@
+import os
+
+# Production server settings: gunicorn -c gunicorn.conf.py app:app
+# /analyze spends most of its time waiting on Gemini and MongoDB, so each worker
+# serves several requests on threads; workers are kept few because each one loads
+# its own spaCy/Presidio model and in-process caches
+bind = os.getenv("BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WEB_WORKERS", "2"))
+worker_class = "gthread"
+threads = int(os.getenv("WEB_THREADS", "8"))
+# Batch analyses wait on several LLM round-trips
+timeout = int(os.getenv("WEB_TIMEOUT", "300"))
+keepalive = 5
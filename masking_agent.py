@@ -1,9 +1,17 @@
 import re
-import random
 import uuid
+import itertools
+import threading
 from presidio_analyzer import AnalyzerEngine, PatternRecognizer, Pattern
 from presidio_analyzer.nlp_engine import NlpEngineProvider
-from pii_store_mongo import store_mapping_with_id, does_collection_id_exist
+from pii_store_mongo import store_mappings_bulk
+
+# Phone numbers and emails in a single alternation; the group name is the entity type.
+# EMAIL comes first so digits that start an email address are masked as part of it.
+REGEX_PII_PATTERN = re.compile(
+    r"(?P<EMAIL>[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})"
+    r"|(?P<PHONE>\b(?:\+91\s?|0)?[6-9]\d{9}\b)"
+)
 
 class PIIMasker:
     def __init__(self):
@@ -28,25 +36,28 @@ class PIIMasker:
         )
         self.analyzer.registry.add_recognizer(address_recognizer)
         
-        self.generated_masked_values = set()
+        # One monotonic counter per entity type keeps placeholders unique without retries.
+        # mask_text runs on several threads, so the known types' counters are created up
+        # front and any other type's counter is created under a lock.
+        self._counters = {entity_type: itertools.count(1) for entity_type in ("ADDRESS", "PHONE", "EMAIL")}
+        self._counters_lock = threading.Lock()
 
     def _generate_unique_collection_id(self):
-        while True:
-            new_id = str(uuid.uuid4())
-            if not does_collection_id_exist(new_id):
-                return new_id
+        # uuid4 collisions are negligible; the unique (collection_id, masked_value) index
+        # in pii_store_mongo would reject one, so no database lookup is needed here
+        return str(uuid.uuid4())
 
     def _generate_unique_masked_value(self, entity_type):
-        for _ in range(100):
-            masked_value = f"<{entity_type}_{random.randint(1000, 9999)}>"
-            if masked_value not in self.generated_masked_values:
-                self.generated_masked_values.add(masked_value)
-                return masked_value
-        raise Exception("Could not generate unique masked value")
+        counter = self._counters.get(entity_type)
+        if counter is None:
+            with self._counters_lock:
+                counter = self._counters.setdefault(entity_type, itertools.count(1))
+        return f"<{entity_type}_{next(counter)}>"
 
     def mask_text(self, text):
         collection_id = self._generate_unique_collection_id()
         mappings = {}
+        seen_originals = set()
         masked_text = text
 
         # Step 1: Mask addresses using Presidio
@@ -54,31 +65,36 @@ class PIIMasker:
         for res in results:
             if res.score > 0.6:
                 original_value = text[res.start:res.end]
-                masked_value = self._generate_unique_masked_value(res.entity_type)
-                mappings[masked_value] = original_value
-                store_mapping_with_id(collection_id, masked_value, original_value)
+                if original_value not in seen_originals:
+                    seen_originals.add(original_value)
+                    masked_value = self._generate_unique_masked_value(res.entity_type)
+                    mappings[masked_value] = original_value
 
-        # Step 2: Mask phone numbers and emails using regex
-        regex_patterns = {
-            "PHONE": r"\b(?:\+91\s?|0)?[6-9]\d{9}\b",
-            "EMAIL": r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}"
-        }
+        # Step 2: Mask phone numbers and emails using one combined regex pass
+        for match in REGEX_PII_PATTERN.finditer(text):
+            original_value = match.group(0)
+            if original_value not in seen_originals:
+                seen_originals.add(original_value)
+                masked_value = self._generate_unique_masked_value(match.lastgroup)
+                mappings[masked_value] = original_value
 
-        for key, pattern in regex_patterns.items():
-            for match in re.finditer(pattern, text):
-                original_value = match.group(0)
-                if original_value not in mappings.values():
-                    masked_value = self._generate_unique_masked_value(key)
-                    mappings[masked_value] = original_value
-                    store_mapping_with_id(collection_id, masked_value, original_value)
+        # Store every mapping for this document in one round-trip
+        store_mappings_bulk(collection_id, mappings.items())
 
-        # Replace original values with masked values
-        for masked, original in mappings.items():
-            masked_text = masked_text.replace(original, masked)
+        # Replace original values with masked values in one pass; longest originals
+        # first so a value contained in another (e.g. inside an address) cannot split it
+        if mappings:
+            masked_by_original = {original: masked for masked, original in mappings.items()}
+            originals = sorted(masked_by_original, key=len, reverse=True)
+            pattern = re.compile('|'.join(map(re.escape, originals)))
+            masked_text = pattern.sub(lambda match: masked_by_original[match.group(0)], text)
 
         return masked_text, mappings, collection_id
 
-# Interface for app.py
+# Interface for app.py. The masker is a process-wide singleton: building it loads the
+# spaCy model, so it must be reused across requests rather than constructed per call.
 masker = PIIMasker()
+# Run one analysis now so spaCy's lazy first-inference setup is not paid by the first upload
+masker.analyzer.analyze(text="warmup", language='en', entities=["ADDRESS"])
 def mask_text(text):
     return masker.mask_text(text)
\ No newline at end of file
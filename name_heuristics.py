@@ -0,0 +1,50 @@
+import logging
+import re
+
+# Logging is configured by the application entry point (app.py)
+logger = logging.getLogger(__name__)
+
+# The name sits at the top of a resume, so only the opening characters are examined
+NAME_EXCERPT_CHARS = 800
+
+# A name line: two or three capitalized words, optionally with a middle initial
+NAME_LINE_PATTERN = re.compile(r'^[A-Z][a-z]+(?:\s+[A-Z]\.?)?(?:\s+[A-Z][a-z]+){1,2}$')
+
+# Title-case header lines that look like names but are not: section headings,
+# personal-detail labels, job titles and the connecting words used in them
+NON_NAME_WORDS = frozenset({
+    # Document titles and section headings
+    "Resume", "Curriculum", "Vitae", "Biodata", "Bio", "Cover", "Letter", "Profile", "Summary",
+    "Overview", "About", "Me", "Contact", "Objective", "Career", "Highlights", "Work", "Experience",
+    "History", "Employment", "Professional", "Personal", "Details", "Information", "Technical",
+    "Skills", "Education", "Academic", "Qualification", "Qualifications", "Projects", "Project",
+    "Key", "Achievements", "Achievement", "Awards", "Certifications", "Courses", "Training",
+    "Internship", "Internships", "Publications", "Activities", "Extracurricular", "Languages",
+    "Hobbies", "Interests", "Strengths", "Core", "Competencies", "Responsibilities", "Roles",
+    "Tools", "Technologies", "References", "Declaration", "Portfolio", "Links", "Page",
+    # Personal-detail labels
+    "Name", "Date", "Birth", "Place", "Address", "Email", "Phone", "Mobile", "Nationality",
+    "Gender", "Marital", "Status", "Father", "Mother",
+    # Job titles and fields
+    "Software", "Engineer", "Developer", "Data", "Scientist", "Analyst", "Manager", "Senior",
+    "Junior", "Full", "Stack", "Machine", "Learning", "Web", "Intern", "Consultant", "Architect",
+    "Team", "Lead", "Head", "Principal", "Staff", "Chief", "Officer", "Executive", "Director",
+    "Specialist", "Associate", "Assistant", "Coordinator", "Trainee", "Student", "Graduate",
+    "Fresher", "Designer", "Tester", "Administrator", "Support", "Operations", "Business",
+    "Product", "Quality", "Assurance", "Cloud", "Backend", "Frontend", "Network",
+    "Security", "Systems",
+    # Connecting words in headings ("Date Of Birth", "Skills And Tools")
+    "Of", "And", "The", "In", "For", "At", "To", "With"
+})
+
+def extract_name_heuristic(masked_text: str) -> str:
+    """
+    Return the candidate name if one of the first lines is plainly a name, else None.
+    """
+    lines = [line.strip() for line in masked_text[:NAME_EXCERPT_CHARS].split('\n') if line.strip()]
+    for line in lines[:5]:
+        candidate = line.title() if line.isupper() else line
+        if NAME_LINE_PATTERN.match(candidate) and not NON_NAME_WORDS.intersection(candidate.split()):
+            logger.info("Candidate name extracted heuristically: %s", candidate)
+            return candidate
+    return None
@@ -1,3 +1,5 @@
+from functools import lru_cache
+import pymongo
 from pymongo import MongoClient
 from dotenv import load_dotenv
 import os
@@ -5,18 +7,38 @@ import os
 load_dotenv()  # Load variables from .env file
 
 mongo_uri = os.getenv("MONGO_URI")
-client = MongoClient(mongo_uri)
+
+# Deadline for queries made while serving a request, applied per operation with
+# pymongo.timeout() so startup index builds and background batch writes are not cut off
+REQUEST_TIMEOUT_SECONDS = 5
+
+@lru_cache(maxsize=1)
+def get_mongo_client():
+    """Return the process-wide MongoClient shared by the app and the PII store."""
+    # A warm pool avoids per-request connection setup; a short server selection timeout fails fast instead of hanging
+    return MongoClient(
+        mongo_uri,
+        maxPoolSize=50,
+        minPoolSize=5,
+        serverSelectionTimeoutMS=2000,
+        retryWrites=True
+    )
+
+client = get_mongo_client()
 db = client["ats_system"]
 pii_collection = db["pii_mappings"]
 
-def store_mapping_with_id(collection_id, masked_value, original_value):
-    """Store PII mapping in MongoDB."""
-    pii_collection.insert_one({
-        "collection_id": collection_id,
-        "masked_value": masked_value,
-        "original_value": original_value
-    })
+def ensure_indexes():
+    """Create the PII store's indexes; called by the application's startup checks."""
+    # Serves lookups by collection_id and rejects a duplicate mapping within one collection
+    pii_collection.create_index([("collection_id", 1), ("masked_value", 1)], unique=True)
 
-def does_collection_id_exist(collection_id):
-    """Check if collection ID exists in MongoDB."""
-    return pii_collection.find_one({"collection_id": collection_id}) is not None
+def store_mappings_bulk(collection_id, items):
+    """Store all PII mappings of one document in a single round-trip."""
+    if not items:
+        return
+    with pymongo.timeout(REQUEST_TIMEOUT_SECONDS):
+        pii_collection.insert_many([
+            {"collection_id": collection_id, "masked_value": masked_value, "original_value": original_value}
+            for masked_value, original_value in items
+        ], ordered=False)
@@ -0,0 +1,49 @@
+import agents
+
+BULLET_JD = (
+    "Required Skills:\n"
+    "- Proficiency in Python and SQL\n"
+    "- Experience with AWS, Docker\n"
+    "- 3+ years of experience"
+)
+
+def test_jd_skills_drop_bullets_labels_and_lead_ins():
+    mandatory, good_to_have = agents._extract_jd_skills(BULLET_JD)
+    assert set(mandatory) == {"Python", "SQL", "AWS", "Docker"}
+    assert good_to_have == ()
+
+def test_bullet_jd_matching_candidate_is_not_rejected_without_llm():
+    resume = "[SECTION: General]\nJane Doe\n5 years of experience\n"
+    projects = [
+        {"name": "API", "description": "Backend", "skills": ["Python", "AWS"]},
+        {"name": "Deploy", "description": "Containers", "skills": ["Docker"]},
+    ]
+    heuristic, decisive = agents._screen_with_heuristic(resume, BULLET_JD, 3, projects)
+    assert not decisive
+    assert "llm_skipped" not in heuristic
+
+def _experience_summary(resume_text):
+    return agents.fallback_ats_score(resume_text, "", 0, [])["summary"]
+
+def test_graduation_year_is_not_read_as_experience():
+    summary = _experience_summary("2 years of experience\nB.Tech 2020\nYear of passing 2020")
+    assert "Experience of 2.0 years" in summary
+
+def test_version_number_is_not_read_as_experience():
+    summary = _experience_summary("3 years of experience with Node.js 18 Express")
+    assert "Experience of 3.0 years" in summary
+
+def test_backoff_delay_without_response_headers():
+    class GrpcCall:
+        pass
+
+    error = agents.ResourceExhausted("quota exceeded", response=GrpcCall())
+    delay = agents._backoff_delay(error, 1)
+    assert 0 < delay <= agents._MAX_BACKOFF_SECONDS
+
+def test_backoff_delay_honors_retry_after_header():
+    class HttpResponse:
+        headers = {"Retry-After": "2"}
+
+    error = agents.ResourceExhausted("quota exceeded", response=HttpResponse())
+    assert agents._backoff_delay(error, 1) == 2.0
@@ -0,0 +1,13 @@
+import pytest
+
+from name_heuristics import extract_name_heuristic
+
+@pytest.mark.parametrize("header", ["Date Of Birth", "Team Lead", "Curriculum Vitae", "CURRICULUM VITAE", "Personal Details"])
+def test_header_lines_are_not_names(header):
+    assert extract_name_heuristic(f"{header}\nsome text") is None
+
+def test_header_before_name_is_skipped():
+    assert extract_name_heuristic("Curriculum Vitae\nPriya R. Sharma\n<EMAIL_1>") == "Priya R. Sharma"
+
+def test_upper_case_name_is_title_cased():
+    assert extract_name_heuristic("RAHUL KUMAR\nSoftware Engineer") == "Rahul Kumar"